@@ -12,12 +12,76 @@ except Exception as e:
     logging.error(f"Error loading model: {e}", exc_info=True)
     raise
 
-def generate_embeddings(trials, batch_size=256):
+EMBEDDING_FIELDS = ("title", "disease", "intervention")
+# Maximum padded tokens (batch items x longest item) per encode call. With the default
+# 256-item cap this starts splitting batches once texts reach 16 tokens, i.e. for most titles.
+TOKEN_BUDGET = 4096
+
+def count_tokens(texts):
+    """
+    Count the tokens each text occupies once tokenized for the model.
+    Args:
+        texts (list): List of input strings.
+    Returns:
+        list: Token count per text, including special tokens and capped at the model's max sequence length.
+    """
+    if not texts:
+        return []
+    encoded = model.tokenizer(
+        texts,
+        add_special_tokens=True,
+        truncation=True,
+        max_length=model.max_seq_length,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )
+    return [len(input_ids) for input_ids in encoded["input_ids"]]
+
+def token_budget_batches(lengths, token_budget=TOKEN_BUDGET, max_batch_size=256):
+    """
+    Group text indices into length-sorted batches that stay under a padded token budget.
+    Args:
+        lengths (list): Token count per text.
+        token_budget (int): Maximum of batch size multiplied by the longest item in the batch.
+        max_batch_size (int): Maximum number of items in a single batch.
+    Returns:
+        list: List of batches, each a list of indices into `lengths`.
+    """
+    batches = []
+    batch = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # Lengths are ascending, so the current item is always the longest in the batch.
+        length = max(lengths[index], 1)
+        if batch and ((len(batch) + 1) * length > token_budget or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+def padded_tokens(batches, lengths):
+    """
+    Count the tokens the model processes for a batching, padding included.
+    Args:
+        batches (list): List of batches, each a list of indices into `lengths`.
+        lengths (list): Token count per text.
+    Returns:
+        int: Sum over batches of batch size multiplied by the longest item in the batch.
+    """
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches if batch)
+
+def generate_embeddings(trials, batch_size=256, token_budget=TOKEN_BUDGET):
     """
-    Generate embeddings for the trials using batching for efficiency.
+    Generate embeddings for the trials using length-bucketed, token-budgeted batching.
+
+    Titles, diseases and interventions are pooled and de-duplicated, sorted by token
+    length and encoded in batches bounded by `token_budget`, so short strings are not
+    padded to the length of long titles. Results are scattered back to the original order.
     Args:
         trials (list): List of trial dictionaries.
-        batch_size (int): Number of items to process in a single batch.
+        batch_size (int): Maximum number of items to process in a single batch.
+        token_budget (int): Maximum padded tokens (items x longest item) in a single batch.
     Returns:
         list: List of trial dictionaries enriched with embeddings.
     """
@@ -26,38 +90,37 @@ def generate_embeddings(trials, batch_size=256):
         if not isinstance(trials, list):
             raise ValueError("Input trials must be a list of dictionaries.")
 
-        # Prepare batched input texts
-        titles = [trial.get('title', "") for trial in trials]
-        diseases = [trial.get('disease', "") for trial in trials]
-        interventions = [trial.get('intervention', "") for trial in trials]
-
-        # Initialize lists to store embeddings
-        title_embeddings = []
-        disease_embeddings = []
-        intervention_embeddings = []
+        # Pool unique input texts across all embedded fields
+        unique_texts = {}
+        for trial in trials:
+            for field in EMBEDDING_FIELDS:
+                unique_texts.setdefault(trial.get(field, ""), len(unique_texts))
+        texts = list(unique_texts)
 
         start_time = time()
 
-        # Generate embeddings in batches
-        for i in range(0, len(trials), batch_size):
-            logging.info(f"Processing batch {i // batch_size + 1}/{-(-len(trials) // batch_size)}")
-
-            title_batch = titles[i:i + batch_size]
-            disease_batch = diseases[i:i + batch_size]
-            intervention_batch = interventions[i:i + batch_size]
-
-            title_embeddings.extend(model.encode(title_batch, batch_size=batch_size, convert_to_tensor=False))
-            disease_embeddings.extend(model.encode(disease_batch, batch_size=batch_size, convert_to_tensor=False))
-            intervention_embeddings.extend(model.encode(intervention_batch, batch_size=batch_size, convert_to_tensor=False))
+        # Generate embeddings in length-sorted, token-budgeted batches
+        lengths = count_tokens(texts)
+        batches = token_budget_batches(lengths, token_budget, batch_size)
+        embeddings = [None] * len(texts)
+        for batch_number, batch in enumerate(batches, start=1):
+            logging.info(f"Processing batch {batch_number}/{len(batches)} ({len(batch)} texts)")
+            batch_embeddings = model.encode([texts[i] for i in batch], batch_size=len(batch), convert_to_tensor=False)
+            for index, embedding in zip(batch, batch_embeddings):
+                embeddings[index] = embedding
 
         # Assign embeddings back to trials
-        for trial, title_emb, disease_emb, intervention_emb in zip(trials, title_embeddings, disease_embeddings, intervention_embeddings):
-            trial['title_embedding'] = title_emb
-            trial['disease_embedding'] = disease_emb
-            trial['intervention_embedding'] = intervention_emb
+        for trial in trials:
+            for field in EMBEDDING_FIELDS:
+                # Copy so trials sharing a text do not share (and mutate) one array
+                trial[f"{field}_embedding"] = embeddings[unique_texts[trial.get(field, "")]].copy()
 
         elapsed_time = time() - start_time
-        logging.info(f"Generated embeddings for {len(trials)} trials in {elapsed_time:.2f} seconds.")
+        logging.info(
+            f"Generated embeddings for {len(trials)} trials in {elapsed_time:.2f} seconds "
+            f"({len(trials) * len(EMBEDDING_FIELDS) / max(elapsed_time, 1e-9):.1f} sentences/sec, "
+            f"{len(texts)} unique texts encoded, {padded_tokens(batches, lengths)} padded tokens)."
+        )
     except Exception as e:
         logging.error(f"Error generating embeddings: {e}", exc_info=True)
         raise
@@ -1,5 +1,6 @@
 import unittest
-from app.embeddings import generate_embeddings
+import numpy as np
+from app.embeddings import generate_embeddings, padded_tokens, token_budget_batches, model
 
 class TestGenerateEmbeddings(unittest.TestCase):
     def setUp(self):
@@ -33,5 +34,55 @@ class TestGenerateEmbeddings(unittest.TestCase):
             for key in original:
                 self.assertEqual(original[key], modified[key], f"Original key {key} was modified")
 
+    def test_generate_embeddings_matches_direct_encoding(self):
+        """Test if bucketed batching returns the same embeddings, in the original order, as direct encoding."""
+        trials = [
+            {"title": "A Randomized Phase 3 Study of Drug X Versus Chemotherapy in Advanced NSCLC", "disease": "NSCLC", "intervention": "N/A"},
+            {"title": "Short", "disease": "Lung Cancer", "intervention": "N/A"},
+            {"title": "Lung Cancer Study", "disease": "NSCLC", "intervention": "Drug Y"},
+        ]
+        enriched = generate_embeddings(trials, batch_size=2, token_budget=16)
+        for field in ("title", "disease", "intervention"):
+            expected = model.encode([trial[field] for trial in trials], convert_to_tensor=False)
+            for trial, expected_emb in zip(enriched, expected):
+                self.assertTrue(
+                    np.allclose(trial[f"{field}_embedding"], expected_emb, atol=1e-5),
+                    f"{field} embedding differs from direct encoding",
+                )
+
+    def test_generate_embeddings_no_shared_arrays(self):
+        """Test if trials with the same text get independent embedding arrays."""
+        trials = [
+            {"title": "Same", "disease": "Same", "intervention": "N/A"},
+            {"title": "Same", "disease": "Other", "intervention": "N/A"},
+        ]
+        enriched = generate_embeddings(trials)
+        self.assertTrue(np.array_equal(enriched[0]["title_embedding"], enriched[1]["title_embedding"]))
+        self.assertIsNot(enriched[0]["title_embedding"], enriched[1]["title_embedding"])
+        self.assertIsNot(enriched[0]["title_embedding"], enriched[0]["disease_embedding"])
+        enriched[0]["intervention_embedding"][0] += 1.0
+        self.assertFalse(np.array_equal(enriched[0]["intervention_embedding"], enriched[1]["intervention_embedding"]))
+
+    def test_token_budget_batches(self):
+        """Test if batches are length-sorted, respect the token budget and cover every index once."""
+        lengths = [12, 3, 7, 3, 30, 5]
+        batches = token_budget_batches(lengths, token_budget=16, max_batch_size=3)
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(len(lengths))))
+        flattened = [lengths[i] for batch in batches for i in batch]
+        self.assertEqual(flattened, sorted(flattened), "Batches should be sorted by token length")
+        for batch in batches:
+            self.assertLessEqual(len(batch), 3, "Batch exceeds max_batch_size")
+            if len(batch) > 1:
+                self.assertLessEqual(len(batch) * max(lengths[i] for i in batch), 16, "Batch exceeds token budget")
+
+    def test_token_budget_never_adds_padding(self):
+        """Test if the token budget never pads more than plain length-sorted batches of max_batch_size."""
+        lengths = [(i * 37) % 120 + 3 for i in range(1000)]
+        unbounded = token_budget_batches(lengths, token_budget=float("inf"), max_batch_size=256)
+        for budget in (512, 4096, 16384):
+            budgeted = token_budget_batches(lengths, token_budget=budget, max_batch_size=256)
+            self.assertLessEqual(padded_tokens(budgeted, lengths), padded_tokens(unbounded, lengths))
+
+
 if __name__ == "__main__":
     unittest.main()
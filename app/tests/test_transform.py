@@ -1,5 +1,6 @@
 import unittest
-from app.transform import transform_data
+from datetime import date
+from app.transform import parse_date, transform_data
 
 class TestTransformData(unittest.TestCase):
     def setUp(self):
@@ -89,6 +90,104 @@ class TestTransformData(unittest.TestCase):
         self.assertIsInstance(transformed, list, "Transformed data should be a list.")
         self.assertEqual(len(transformed), 0, "Transformed data should be empty for empty input.")
 
+    def test_transform_data_v2_schema(self):
+        """Test if transform_data correctly maps fields from the v2 camelCase schema."""
+        v2_data = [
+            {
+                "protocolSection": {
+                    "identificationModule": {"nctId": "NCT789", "briefTitle": "V2 Trial"},
+                    "designModule": {"phases": ["PHASE2"]},
+                    "armsInterventionsModule": {"interventions": [{"name": "Drug Z"}]},
+                    "statusModule": {
+                        "overallStatus": "RECRUITING",
+                        "lastUpdatePostDateStruct": {"date": "2024-01-02"}
+                    }
+                }
+            },
+            {"protocolSection": {"identificationModule": {"nctId": "NCT000"}}}
+        ]
+        transformed = transform_data(v2_data)
+        self.assertEqual(len(transformed), 1, "Study without a title should be skipped.")
+        self.assertEqual(transformed[0], {
+            "nct_number": "NCT789",
+            "title": "V2 Trial",
+            "phase": "PHASE2",
+            "intervention": "Drug Z",
+            "status": "RECRUITING",
+            "last_update": date(2024, 1, 2),
+        })
+
+    def test_transform_data_invalid_date(self):
+        """Test if transform_data keeps a study with an unparseable date and sets last_update to None."""
+        study = self.raw_data["FullStudiesResponse"]["FullStudies"][0]["Study"]["ProtocolSection"]
+        study["StatusModule"]["LastUpdatePostDateStruct"]["LastUpdatePostDate"] = "November 14, 2023"
+        transformed = transform_data(self.raw_data)
+        self.assertEqual(len(transformed), 1, "Transformed data should contain one trial.")
+        self.assertIsNone(transformed[0]['last_update'], "Last update should be None for an invalid date.")
+
+    def test_parse_date_matches_strptime_format(self):
+        """Test if parse_date accepts exactly the "%Y-%m-%d" inputs, independent of Python version."""
+        self.assertEqual(parse_date("2024-01-02"), date(2024, 1, 2))
+        self.assertEqual(parse_date("2024-1-2"), date(2024, 1, 2))
+        for value in ("20240102", "2024-W01-2", "2024-01", "2024-02-30", "January 2, 2024"):
+            with self.assertRaises(ValueError, msg=f"{value!r} should be rejected"):
+                parse_date(value)
+
+    def test_transform_data_empty_values(self):
+        """Test if empty required fields skip the study and an empty v2 phase list falls back to N/A."""
+        v2_data = [
+            {"protocolSection": {"identificationModule": {"nctId": "", "briefTitle": "No Id"}}},
+            {"protocolSection": {"identificationModule": {"nctId": "NCT001", "briefTitle": ""}}},
+            {
+                "protocolSection": {
+                    "identificationModule": {"nctId": "NCT002", "briefTitle": "No Phase"},
+                    "designModule": {"phases": []}
+                }
+            }
+        ]
+        transformed = transform_data(v2_data)
+        self.assertEqual([trial['nct_number'] for trial in transformed], ["NCT002"], "Empty required fields should skip the study.")
+        self.assertEqual(transformed[0]['phase'], "N/A", "Empty phase list should default to N/A.")
+
+    def test_transform_data_v2_intervention_name(self):
+        """Test if a v2 study's intervention is its first intervention name rather than N/A."""
+        v2_data = [
+            {
+                "protocolSection": {
+                    "identificationModule": {"nctId": "NCT321", "briefTitle": "V2 Intervention Trial"},
+                    "armsInterventionsModule": {"interventions": [{"name": "Pembrolizumab"}, {"name": "Placebo"}]}
+                }
+            }
+        ]
+        transformed = transform_data(v2_data)
+        self.assertEqual(transformed[0]['intervention'], "Pembrolizumab", "v2 intervention name should be extracted.")
+
+    def test_transform_data_mixed_schemas(self):
+        """Test if legacy and v2 studies on one page are each mapped with their own schema, in order."""
+        legacy_study = self.raw_data["FullStudiesResponse"]["FullStudies"][0]
+        v2_study = {
+            "protocolSection": {
+                "identificationModule": {"nctId": "NCT789", "briefTitle": "V2 Trial"},
+                "designModule": {"phases": ["PHASE2"]},
+                "armsInterventionsModule": {"interventions": [{"name": "Drug Z"}]},
+                "statusModule": {
+                    "overallStatus": "RECRUITING",
+                    "lastUpdatePostDateStruct": {"date": "2024-01-02"}
+                }
+            }
+        }
+        v2_minimal = {"protocolSection": {"identificationModule": {"nctId": "NCT790", "briefTitle": "Minimal"}}}
+        pages = (
+            ([v2_study, legacy_study, v2_minimal], ["NCT789", "NCT123", "NCT790"]),
+            ([legacy_study, v2_study, v2_minimal], ["NCT123", "NCT789", "NCT790"]),
+        )
+        for page, expected_ids in pages:
+            transformed = transform_data(page)
+            self.assertEqual([trial['nct_number'] for trial in transformed], expected_ids, "Study order mismatch.")
+            by_id = {trial['nct_number']: trial for trial in transformed}
+            self.assertEqual(by_id["NCT123"], transform_data(self.raw_data)[0], "Legacy study mismatch on mixed page.")
+            self.assertEqual(by_id["NCT789"]['intervention'], "Drug Z", "v2 study mismatch on mixed page.")
+            self.assertEqual(by_id["NCT790"]['phase'], "N/A", "Missing optional modules should use defaults.")
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,181 @@
 import logging
-from datetime import datetime
+from datetime import date, datetime
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Path from a study to its protocol section for each supported schema:
+# "legacy" is the FullStudiesResponse PascalCase format, "v2" the camelCase API v2 format.
+PROTOCOL_SECTION_PATHS = {
+    "legacy": ("Study", "ProtocolSection"),
+    "v2": ("protocolSection",),
+}
+
+def parse_date(value):
+    """
+    Parse a YYYY-MM-DD date string, using date.fromisoformat as the fast path.
+
+    The fast path is limited to the YYYY-MM-DD shape because date.fromisoformat accepts
+    other ISO 8601 forms (e.g. "20240102") on Python 3.11+; everything else goes through
+    strptime so accepted inputs do not depend on the interpreter version.
+
+    Args:
+        value (str): Raw date string.
+
+    Returns:
+        datetime.date: Parsed date.
+
+    Raises:
+        ValueError: If the value is not a valid "%Y-%m-%d" date.
+    """
+    if len(value) == 10 and value[4] == value[7] == "-":
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+# Declarative field spec: output field -> path within the protocol section per schema.
+# Required fields skip the study when missing or empty; other fields fall back to `default`
+# when missing or empty, and `parser` (if any) converts present values.
+FIELD_SPEC = {
+    "nct_number": {
+        "legacy": ("IdentificationModule", "NCTId"),
+        "v2": ("identificationModule", "nctId"),
+        "required": True,
+    },
+    "title": {
+        "legacy": ("IdentificationModule", "BriefTitle"),
+        "v2": ("identificationModule", "briefTitle"),
+        "required": True,
+    },
+    "phase": {
+        "legacy": ("DesignModule", "PhaseList", "Phase"),
+        "v2": ("designModule", "phases", 0),
+        "default": "N/A",
+    },
+    "intervention": {
+        "legacy": ("ArmsInterventionsModule", "InterventionList", "Intervention", 0, "InterventionName"),
+        "v2": ("armsInterventionsModule", "interventions", 0, "name"),
+        "default": "N/A",
+    },
+    "status": {
+        "legacy": ("StatusModule", "OverallStatus"),
+        "v2": ("statusModule", "overallStatus"),
+        "default": "N/A",
+    },
+    "last_update": {
+        "legacy": ("StatusModule", "LastUpdatePostDateStruct", "LastUpdatePostDate"),
+        "v2": ("statusModule", "lastUpdatePostDateStruct", "date"),
+        "default": None,
+        "parser": parse_date,
+    },
+}
+
+def _compile_path(path):
+    """Build a getter that follows `path` through nested dicts/lists, returning None if it is absent."""
+    def get(node):
+        try:
+            for key in path:
+                node = node[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+        return node
+    return get
+
+def compile_extractor(schema, spec=FIELD_SPEC):
+    """
+    Compile the field spec into an extractor specialized for one schema.
+
+    Args:
+        schema (str): Schema name, a key of PROTOCOL_SECTION_PATHS.
+        spec (dict): Declarative field spec.
+
+    Returns:
+        callable: Function mapping a raw study to a trial dictionary, or None if required fields are missing.
+    """
+    get_protocol_section = _compile_path(PROTOCOL_SECTION_PATHS[schema])
+    fields = [
+        (name, _compile_path(field[schema]), field.get("default"), field.get("required", False), field.get("parser"))
+        for name, field in spec.items()
+    ]
+
+    def extract(study):
+        protocol_section = get_protocol_section(study) or {}
+        trial = {}
+        for name, get, default, required, parser in fields:
+            value = get(protocol_section)
+            if not value:
+                if required:
+                    logging.warning(f"Skipping study due to missing required field: {name}")
+                    return None
+                value = default
+            elif parser is not None:
+                try:
+                    value = parser(value)
+                except ValueError:
+                    logging.warning(f"Invalid {name} for study {trial.get('nct_number')}: {value}")
+                    value = default
+            trial[name] = value
+        return trial
+
+    return extract
+
+EXTRACTORS = {schema: compile_extractor(schema) for schema in PROTOCOL_SECTION_PATHS}
+
+def detect_schema(study):
+    """Return the schema name a raw study uses."""
+    return "legacy" if isinstance(study, dict) and "Study" in study else "v2"
+
+def extract_studies(raw_data):
+    """
+    Extract the list of raw studies from ingested data or a parsed API response.
+
+    Args:
+        raw_data (list or dict): List of studies, a v2 page ({"studies": [...]}) or a FullStudiesResponse.
+
+    Returns:
+        list: Raw studies.
+    """
+    if isinstance(raw_data, dict):
+        if "studies" in raw_data:
+            return raw_data["studies"]
+        return raw_data.get("FullStudiesResponse", {}).get("FullStudies", [])
+    if isinstance(raw_data, list):
+        return raw_data
+    raise ValueError("Invalid raw_data format: Expected dict or list.")
+
+def transform_page(studies):
+    """
+    Transform one page of raw studies.
+
+    The schema is detected once from the page's first study and its extractor is used for
+    every study carrying that schema's root key; only studies without it are re-detected.
+
+    Args:
+        studies (list): Raw studies from a single page.
+
+    Returns:
+        list: Transformed list of clinical trial dictionaries.
+    """
+    if not studies:
+        return []
+    page_schema = detect_schema(studies[0])
+    page_extractor = EXTRACTORS[page_schema]
+    page_root_key = PROTOCOL_SECTION_PATHS[page_schema][0]
+    transformed_trials = []
+    for study in studies:
+        try:
+            if isinstance(study, dict) and page_root_key in study:
+                trial = page_extractor(study)
+            else:
+                trial = EXTRACTORS[detect_schema(study)](study)
+            if trial is not None:
+                transformed_trials.append(trial)
+        except Exception as inner_e:
+            logging.warning(f"Error processing study: {inner_e}")
+            continue
+    return transformed_trials
+
 def transform_data(raw_data):
     """
     Transform raw clinical trial data into a standardized format.
@@ -14,90 +187,8 @@ def transform_data(raw_data):
         list: Transformed list of clinical trial dictionaries.
     """
     logging.info("Starting data transformation.")
-    transformed_trials = []
     try:
-        # Determine input type and extract studies
-        if isinstance(raw_data, dict):
-            studies = raw_data.get("FullStudiesResponse", {}).get("FullStudies", [])
-        elif isinstance(raw_data, list):
-            studies = raw_data
-        else:
-            raise ValueError("Invalid raw_data format: Expected dict or list.")
-
-        for study in studies:
-            try:
-                # Parse nested sections
-                protocol_section = (
-                    study.get("Study", {}).get("ProtocolSection", {})
-                    if isinstance(study, dict) and "Study" in study
-                    else study.get("protocolSection", {})
-                )
-                identification_module = (
-                    protocol_section.get("IdentificationModule", {}) or
-                    protocol_section.get("identificationModule", {})
-                )
-                design_module = (
-                    protocol_section.get("DesignModule", {}) or
-                    protocol_section.get("designModule", {})
-                )
-                arms_interventions_module = (
-                    protocol_section.get("ArmsInterventionsModule", {}) or
-                    protocol_section.get("armsInterventionsModule", {})
-                )
-                status_module = (
-                    protocol_section.get("StatusModule", {}) or
-                    protocol_section.get("statusModule", {})
-                )
-
-                # Extract required fields
-                nct_number = identification_module.get("NCTId") or identification_module.get("nctId", "Unknown")
-                title = identification_module.get("BriefTitle") or identification_module.get("briefTitle", "Untitled")
-                if nct_number == "Unknown" or title == "Untitled":
-                    logging.warning(f"Skipping study due to missing required fields: NCTId={nct_number}, Title={title}")
-                    continue
-
-                # Extract optional fields with defaults
-                phase = (
-                    design_module.get("PhaseList", {}).get("Phase", "N/A")
-                    if "PhaseList" in design_module
-                    else design_module.get("phases", ["N/A"])[0]
-                )
-                interventions = (
-                    arms_interventions_module.get("InterventionList", {}).get("Intervention", [{}])
-                    or arms_interventions_module.get("interventions", [{}])
-                )
-                intervention_name = (
-                    interventions[0].get("InterventionName")
-                    or interventions[0].get("name", "N/A")
-                    if interventions
-                    else "N/A"
-                )
-                status = status_module.get("OverallStatus") or status_module.get("overallStatus", "N/A")
-                last_update_raw = (
-                    status_module.get("LastUpdatePostDateStruct", {}).get("LastUpdatePostDate") or
-                    status_module.get("lastUpdatePostDateStruct", {}).get("date")
-                )
-                last_update = None
-                if last_update_raw:
-                    try:
-                        last_update = datetime.strptime(last_update_raw, "%Y-%m-%d").date()
-                    except ValueError:
-                        logging.warning(f"Invalid date format for study {nct_number}: {last_update_raw}")
-
-                # Construct the trial dictionary
-                trial = {
-                    "nct_number": nct_number,
-                    "title": title,
-                    "phase": phase,
-                    "intervention": intervention_name,
-                    "status": status,
-                    "last_update": last_update,
-                }
-                transformed_trials.append(trial)
-            except Exception as inner_e:
-                logging.warning(f"Error processing study: {inner_e}")
-                continue
-
+        transformed_trials = transform_page(extract_studies(raw_data))
         logging.info(f"Transformed {len(transformed_trials)} trials.")
     except Exception as e:
         logging.error(f"Error transforming data: {e}", exc_info=True)